@@ -0,0 +1,202 @@
+"""
+Log file parsing for import_logs
+File: crazyLibApp/management/commands/_parsing.py
+
+Does not import models, so records can be parsed in worker processes
+"""
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from sys import intern
+
+import ciso8601
+import ijson
+import orjson
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+# Same values as LibraryEvent.EventType
+BORROW = "BORROW"
+RELEASE = "RELEASE"
+
+# Records per task sent to a worker process
+PARSE_CHUNK_SIZE = 10_000
+
+# Large read buffer for streaming multi-GB logs
+READ_BUFFER_SIZE = 1 << 20
+
+# Resolved once instead of on every make_aware() call
+DEFAULT_TZ = timezone.get_default_timezone()
+
+
+# Raw Type value -> event type; covers the spellings seen in logs without strip()/lower()
+EVENT_TYPE_MAP = {
+    **{v: BORROW for v in ("borrow", "Borrow", "BORROW")},
+    **{v: RELEASE for v in ("release", "Release", "RELEASE")},
+}
+
+
+def normalize_event_type(value: str) -> str:
+    event_type = EVENT_TYPE_MAP.get(value)
+    if event_type is None:
+        event_type = EVENT_TYPE_MAP.get((value or "").strip().lower())
+    if event_type is None:
+        raise ValueError(f"Unknown event Type: {value!r}")
+    return event_type
+
+
+@lru_cache(maxsize=200_000)
+def parse_datetime_cached(dt_string):
+    """Parse a datetime string once - log files repeat the same values a lot"""
+    try:
+        # Fast path: C ISO 8601 parser, returns aware datetimes when an offset is present
+        dt = ciso8601.parse_datetime(dt_string)
+    except ValueError:
+        dt = parse_datetime(dt_string)
+        if not dt:
+            formats = ['%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']
+            for fmt in formats:
+                try:
+                    dt = datetime.strptime(str(dt_string), fmt)
+                    break
+                except ValueError:
+                    continue
+
+    if dt and timezone.is_naive(dt):
+        dt = dt.replace(tzinfo=DEFAULT_TZ)  # FIX TIMEZONE WARNING
+
+    return dt
+
+
+def safe_parse_datetime(dt_string):
+    """Parse datetime with timezone awareness - FIXES WARNING"""
+    if not dt_string:
+        return None
+
+    try:
+        return parse_datetime_cached(dt_string)
+    except Exception:
+        return None
+
+
+def peek_first_char(f) -> bytes:
+    """Return the first non-whitespace byte of a binary file and rewind it"""
+    while True:
+        ch = f.read(1)
+        if not ch or not ch.isspace():
+            f.seek(0)
+            return ch
+
+
+def iter_records(file_path: str):
+    """supports JSON Lines, JSON Array, Single JSON object
+
+    Streams records from disk - the file is never read into memory as a whole
+    """
+    with open(file_path, "rb", buffering=READ_BUFFER_SIZE) as f:
+        first = peek_first_char(f)
+        if not first:
+            return
+
+        if first == b"[":
+            for r in ijson.items(f, "item"):
+                if isinstance(r, dict):
+                    yield r
+            return
+
+        if first != b"{":
+            raise ValueError("Unsupported JSON root type")
+
+        # JSON Lines if the first line is a complete object, otherwise a single (pretty-printed) object
+        first_line = f.readline()
+        try:
+            yield orjson.loads(first_line)
+        except orjson.JSONDecodeError:
+            f.seek(0)
+            yield from ijson.items(f, "", multiple_values=True)
+            return
+
+        # orjson ignores surrounding whitespace - only blank lines need skipping
+        for line in f:
+            if line.isspace():
+                continue
+            yield orjson.loads(line)
+
+
+# One log record with every field the import needs, extracted once
+ParsedRecord = namedtuple(
+    "ParsedRecord",
+    "passport unique_id title author_name call_number event_type action_dt cust lc book_block",
+)
+
+
+def parse_records(records):
+    """Extract fields from raw records
+
+    event_type/action_dt are None when the record has an unknown Type or bad ActionDateTime
+    """
+    for record in records:
+        cust = record.get("Customer") or {}
+        book_block = record.get("Book") or {}
+        lc = (book_block.get("Literary Creation")
+              or book_block.get("LiteraryCreation") or {})
+
+        author = lc.get("Author") or {}
+        try:
+            event_type = normalize_event_type(record.get("Type"))
+        except ValueError:
+            event_type = None
+
+        # Keys repeat across many records - intern them so each is stored once
+        yield ParsedRecord(
+            passport=intern((cust.get("Passport") or "").strip()),
+            unique_id=intern((lc.get("UniqueID") or "").strip()),
+            title=(lc.get("Title") or "").strip(),
+            author_name=author.get("Name") if isinstance(author, dict) else None,
+            call_number=intern((book_block.get("LibraryCallNumber") or "").strip()),
+            event_type=event_type,
+            action_dt=safe_parse_datetime(record.get("ActionDateTime")) if event_type else None,
+            cust=cust,
+            lc=lc,
+            book_block=book_block,
+        )
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_chunk(records):
+    """Worker entry point - parse one chunk of raw records"""
+    return list(parse_records(records))
+
+
+def parse_records_parallel(records, workers):
+    """Parse records in a process pool, yielding ParsedRecords in file order
+
+    Only a few chunks are in flight at a time, so the input is still streamed
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunked(records, PARSE_CHUNK_SIZE):
+            pending.append(executor.submit(parse_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parse_file(file_path, workers=1):
+    """Stream ParsedRecords from a log file, in worker processes when workers > 1"""
+    records = iter_records(file_path)
+    if workers > 1:
+        return parse_records_parallel(records, workers)
+    return parse_records(records)
@@ -7,147 +7,218 @@ Counts BORROW events per book and sets availability
 
 import json
 import hashlib
-from datetime import datetime
+import os
 from collections import defaultdict
+from datetime import UTC
 
+import ijson
+import orjson
+
+from ._parsing import parse_file, safe_parse_datetime
 from ...models import Customer, Book, BookCopy, LibraryEvent
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
-from django.utils import timezone
-from django.utils.dateparse import parse_datetime
-
-
-def normalize_event_type(value: str) -> str:
-    v = (value or "").strip().lower()
-    if v == "borrow":
-        return LibraryEvent.EventType.BORROW
-    if v == "release":
-        return LibraryEvent.EventType.RELEASE
-    raise ValueError(f"Unknown event Type: {value!r}")
-
-
-def sha256_hex(s: str) -> str:
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
-
-
-def safe_parse_datetime(dt_string):
-    """Parse datetime with timezone awareness - FIXES WARNING"""
-    if not dt_string:
-        return None
-
-    try:
-        dt = parse_datetime(dt_string)
-        if not dt:
-            formats = ['%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']
-            for fmt in formats:
-                try:
-                    dt = datetime.strptime(str(dt_string), fmt)
-                    break
-                except ValueError:
-                    continue
-
-        if dt and timezone.is_naive(dt):
-            dt = timezone.make_aware(dt)  # FIX TIMEZONE WARNING
-
-        return dt
-    except Exception:
-        return None
-
-
-def iter_records(file_path: str):
-    """supports JSON Lines, JSON Array, Single JSON object"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read().strip()
-
-    if not content:
-        return
-
-    if content[0] in "[{":
-        data = json.loads(content)
-        if isinstance(data, list):
-            for r in data:
-                if isinstance(r, dict):
-                    yield r
-        elif isinstance(data, dict):
-            yield data
-        else:
-            raise ValueError("Unsupported JSON root type")
-        return
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            yield json.loads(line)
-
-
-def extract_call_number(record: dict) -> str:
-    """Extract LibraryCallNumber from a record"""
-    book_block = record.get("Book") or {}
-    return (book_block.get("LibraryCallNumber") or "").strip()
-
-
-def analyze_library_events(records: list):
-    """Combined function: find errors, calculate availability and borrow counts"""
-    copy_events = {}  # call_number -> events
+from django.db import connection, transaction
+from django.db.models import Case, OuterRef, Subquery, Value, When
+from django.db.models.lookups import Exact
+
+
+# Rows per INSERT statement for bulk writes
+BATCH_SIZE = 10_000
+
+CUSTOMER_UPDATE_FIELDS = [
+    "first_name", "last_name", "phone", "email", "birth_date",
+    "address", "city_raw", "zip", "updated_at",
+]
+BOOK_UPDATE_FIELDS = [
+    "title", "author_name", "description_html", "publication_date",
+    "image_url", "total_borrowed", "updated_at",
+]
+COPY_UPDATE_FIELDS = ["book"]  # availability is recomputed from events in the DB
+
+
+HASH_SEP = b"|"
+
+
+def event_hash(event_type, action_dt, passport, call_number) -> str:
+    """source_hash of an event - 128-bit BLAKE2b, 32 hex chars
+
+    action_dt is hashed in UTC so the value matches what is read back from the DB
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(event_type.encode())
+    h.update(HASH_SEP)
+    h.update(action_dt.astimezone(UTC).isoformat().encode())
+    h.update(HASH_SEP)
+    h.update(passport.encode())
+    h.update(HASH_SEP)
+    h.update(call_number.encode())
+    return h.hexdigest()
+
+
+def bulk_upsert(model, objs, unique_field, update_fields):
+    """INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE in batches"""
+    options = {}
+    # MySQL upserts on any unique key and rejects an explicit conflict target
+    if connection.features.supports_update_conflicts_with_target:
+        options["unique_fields"] = [unique_field]
+
+    model.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        update_fields=update_fields,
+        batch_size=BATCH_SIZE,
+        **options,
+    )
+
+
+def natural_key_ids(model, field, keys):
+    """Map natural key -> primary key without hydrating model instances
+
+    The IN list is split into BATCH_SIZE chunks to keep statements small.
+    Case-insensitive collations (MySQL *_ci) let a key match a row stored with
+    another spelling, and the row comes back under that spelling - such keys
+    are looked up again one by one, case-insensitively
+    """
+    keys = list(keys)
+    ids = {}
+    for i in range(0, len(keys), BATCH_SIZE):
+        ids.update(model.objects.filter(**{f"{field}__in": keys[i:i + BATCH_SIZE]}).values_list(field, "id"))
+
+    for key in keys:
+        if key not in ids:
+            row_id = model.objects.filter(**{f"{field}__iexact": key}).values_list("id", flat=True).first()
+            if row_id is not None:
+                ids[key] = row_id
+    return ids
+
+
+def upsert_customers(customers):
+    """customers: passport -> Customer fields, birth_date still a raw string"""
+    bulk_upsert(Customer, [
+        Customer(passport=p, **dict(fields, birth_date=safe_parse_datetime(fields["birth_date"])))
+        for p, fields in customers.items()
+    ], "passport", CUSTOMER_UPDATE_FIELDS)
+
+
+def upsert_books(books):
+    """books: unique_id -> Book fields, publication_date still a raw string"""
+    bulk_upsert(Book, [
+        Book(unique_id=u, **dict(fields, publication_date=safe_parse_datetime(fields["publication_date"])))
+        for u, fields in books.items()
+    ], "unique_id", BOOK_UPDATE_FIELDS)
+
+
+def upsert_copies(copies):
+    """copies: call_number -> book unique_id"""
+    # Resolve FK ids by natural key instead of holding model instances
+    book_ids = natural_key_ids(Book, "unique_id", set(copies.values()))
+    bulk_upsert(BookCopy, [
+        BookCopy(
+            call_number=call_number,
+            book_id=book_ids[unique_id],
+        )
+        for call_number, unique_id in copies.items()
+    ], "call_number", COPY_UPDATE_FIELDS)
+
+
+def insert_events(events):
+    """events: iterable of (event_type, action_dt, passport, call_number)
+
+    Events already in the DB are rejected by the unique constraint;
+    returns the number of events actually inserted
+    """
+    customer_ids = natural_key_ids(Customer, "passport", {e[2] for e in events})
+    copy_ids = natural_key_ids(BookCopy, "call_number", {e[3] for e in events})
+
+    # Recount only this chunk's copies (book_copy index), not the whole table
+    chunk_events = LibraryEvent.objects.filter(book_copy_id__in=set(copy_ids.values()))
+    events_before = chunk_events.count()
+
+    LibraryEvent.objects.bulk_create([
+        LibraryEvent(
+            source_hash=event_hash(event_type, action_dt, passport, call_number),
+            event_type=event_type,
+            action_dt=action_dt,
+            customer_id=customer_ids[passport],
+            book_copy_id=copy_ids[call_number],
+        )
+        for event_type, action_dt, passport, call_number in events
+    ], ignore_conflicts=True, batch_size=BATCH_SIZE)
+
+    return chunk_events.count() - events_before
+
+
+def refresh_copy_availability(call_numbers):
+    """A copy is available unless its last event is a BORROW - one UPDATE, computed by the DB
+
+    Each copy's events are found through the (book_copy, action_dt) index; the
+    event_type tie-break is not in the index, so MySQL sorts those few rows per copy
+    """
+    last_event_type = LibraryEvent.objects.filter(
+        book_copy=OuterRef("pk"),
+    ).order_by("-action_dt", "-event_type").values("event_type")[:1]
+
+    BookCopy.objects.filter(call_number__in=call_numbers).update(
+        available=Case(
+            When(Exact(Subquery(last_event_type), LibraryEvent.EventType.BORROW), then=Value(False)),
+            default=Value(True),
+        )
+    )
+
+
+def analyze_library_events(parsed_records):
+    """Combined function: find errors and calculate borrow counts
+
+    Logs are mostly chronological, so errors are tracked while reading;
+    only call numbers that received an out-of-order event are sorted afterwards
+    """
+    copy_events = defaultdict(list)  # call_number -> [(action_dt, event_type), ...]
+    last_seen = {}  # call_number -> latest (action_dt, event_type)
+    needs_sort = set()  # call_numbers with an out-of-order event
+    error_books = set()
     book_borrow_counts = defaultdict(int)  # unique_id -> total borrow count
 
-    # Single pass: group events and count borrows
-    for record in records:
-        call_num = extract_call_number(record)
-        if not call_num:
+    # Single pass: group events, count borrows, find errors in chronological runs
+    for rec in parsed_records:
+        call_num = rec.call_number
+        action_dt = rec.action_dt
+        if not call_num or not action_dt:
             continue
 
-        # Extract book unique_id
-        book_block = record.get("Book") or {}
-        lc = (book_block.get("Literary Creation")
-              or book_block.get("LiteraryCreation") or {})
-        unique_id = (lc.get("UniqueID") or "").strip()
-
-        try:
-            event_type = normalize_event_type(record.get("Type"))
-            action_dt = safe_parse_datetime(record.get("ActionDateTime"))
-
-            if not action_dt:
-                continue
+        event_type = rec.event_type
+        unique_id = rec.unique_id
 
-            # Count BORROW events for this book
-            if unique_id and event_type == LibraryEvent.EventType.BORROW:
-                book_borrow_counts[unique_id] += 1
+        # Count BORROW events for this book
+        if unique_id and event_type == LibraryEvent.EventType.BORROW:
+            book_borrow_counts[unique_id] += 1
 
-            # Group events by call_number
-            if call_num not in copy_events:
-                copy_events[call_num] = []
-
-            copy_events[call_num].append({
-                'type': event_type,
-                'datetime': action_dt
-            })
-        except ValueError:
-            continue
-
-    # Single pass: find errors and calculate availability
-    error_books = set()
-    availability_states = {}
+        # Group events by call_number as (datetime, type) tuples
+        event = (action_dt, event_type)
+        events = copy_events[call_num]
+        if events:
+            last = last_seen[call_num]
+            if event < last:
+                needs_sort.add(call_num)
+            else:
+                last_seen[call_num] = event
+                if last[1] == event_type:
+                    error_books.add(call_num)  # same type twice in a row
+        else:
+            last_seen[call_num] = event
+        events.append(event)
 
-    for call_num, events in copy_events.items():
-        events.sort(key=lambda x: x['datetime'])
+    # Out-of-order call numbers: the running check above is not valid, redo it on sorted events
+    for call_num in needs_sort:
+        error_books.discard(call_num)
+        events = copy_events[call_num]
+        events.sort()  # datetime first - plain tuple comparison, no key callback
 
-        # Find logic errors
         for i in range(1, len(events)):
-            if events[i-1]['type'] == events[i]['type']:
+            if events[i-1][1] == events[i][1]:
                 error_books.add(call_num)
                 break
 
-        # Calculate availability: check only last event
-        if events:
-            last_event = events[-1]
-            availability_states[call_num] = (last_event['type'] == LibraryEvent.EventType.RELEASE)
-        else:
-            availability_states[call_num] = True
-
-    return error_books, availability_states, dict(book_borrow_counts)
+    return error_books, dict(book_borrow_counts)
 
 
 class Command(BaseCommand):
@@ -157,26 +228,43 @@ class Command(BaseCommand):
         parser.add_argument("file_path", type=str)
         parser.add_argument("--dry-run", action="store_true", help="Parse but do not write to DB")
         parser.add_argument("--limit", type=int, default=None, help="Process only first N records")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Parse records in N processes (0 = one per CPU)")
+
+    def write_chunk(self, customers, books, copies, events):
+        """Flush one chunk of staged rows and reset the buffers, returns the number of new events"""
+        upsert_customers(customers)
+        upsert_books(books)
+        upsert_copies(copies)
+        created = insert_events(events)
+        refresh_copy_availability(copies)
+
+        customers.clear()
+        books.clear()
+        copies.clear()
+        events.clear()
+        return created
 
     def handle(self, *args, **options):
         file_path = options["file_path"]
         dry_run = options["dry_run"]
         limit = options["limit"]
+        workers = options["workers"] or os.cpu_count()
 
         self.stdout.write(f"Importing logs from: {file_path}")
         if dry_run:
             self.stdout.write(self.style.WARNING("DRY RUN: no writes to DB"))
 
+        # Pass 1: analysis - only per-copy event tuples and borrow counts are kept in memory
         try:
-            all_records = list(iter_records(file_path))
+            error_call_numbers, borrow_counts = analyze_library_events(
+                parse_file(file_path, workers)
+            )
         except FileNotFoundError:
             raise CommandError(f"File not found: {file_path}")
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, orjson.JSONDecodeError, ijson.JSONError) as e:
             raise CommandError(f"Invalid JSON: {e}")
 
-        # Combined analysis
-        error_call_numbers, availability_states, borrow_counts = analyze_library_events(all_records)
-
         if error_call_numbers:
             self.stdout.write(self.style.WARNING(
                 f"Found {len(error_call_numbers)} books with logic errors (will be excluded)"
@@ -189,110 +277,84 @@ class Command(BaseCommand):
         skipped_events = 0
         excluded_errors = 0
 
-        try:
-            for record in all_records:
-                processed += 1
-                if limit and processed > limit:
-                    break
-
-                # Extract customer data
-                cust = record.get("Customer") or {}
-                passport = (cust.get("Passport") or "").strip()
-                if not passport:
-                    skipped_events += 1
-                    continue
-
-                # Extract book data
-                book_block = record.get("Book") or {}
-                lc = (book_block.get("Literary Creation")
-                      or book_block.get("LiteraryCreation") or {})
-
-                unique_id = (lc.get("UniqueID") or "").strip()
-                title = (lc.get("Title") or "").strip()
-                if not unique_id or not title:
-                    skipped_events += 1
-                    continue
-
-                author = lc.get("Author") or {}
-                author_name = author.get("Name") if isinstance(author, dict) else None
+        # Rows staged for the current chunk, deduplicated on their natural (unique) field
+        customers = {}  # passport -> Customer fields
+        books = {}  # unique_id -> Book fields
+        copies = {}  # call_number -> unique_id
+        events = {}  # (event_type, action_dt, passport, call_number) -> None, keeps file order
+        staged_events = 0
 
-                call_number = (book_block.get("LibraryCallNumber") or "").strip()
-                if not call_number:
-                    skipped_events += 1
-                    continue
+        def importable(records):
+            """Records up to --limit, minus those on error copies
 
-                # Check for logic errors
-                if call_number in error_call_numbers:
+            Every record read counts as processed, excluded ones too
+            """
+            nonlocal processed, excluded_errors
+            for rec in records:
+                processed += 1
+                if limit and processed > limit:
+                    return
+                # Records missing a key field are left to the loop, which skips them
+                if (rec.call_number in error_call_numbers
+                        and rec.passport and rec.unique_id and rec.title):
                     excluded_errors += 1
                     continue
+                yield rec
 
-                event_type = normalize_event_type(record.get("Type"))
-                action_dt = safe_parse_datetime(record.get("ActionDateTime"))
-                if action_dt is None:
-                    skipped_events += 1
-                    continue
+        try:
+            with transaction.atomic():
+                # Pass 2: stream the file again straight into chunked DB writes,
+                # error copies are filtered out before the loop body sees them
+                for (passport, unique_id, title, author_name, call_number,
+                     event_type, action_dt, cust, lc, book_block) in importable(parse_file(file_path, workers)):
+                    if not passport or not unique_id or not title or not call_number:
+                        skipped_events += 1
+                        continue
+
+                    if action_dt is None:
+                        skipped_events += 1
+                        continue
+
+                    if dry_run:
+                        continue
+
+                    # Last record wins for customer/book fields
+                    customers[passport] = {
+                        "first_name": cust.get("FirstName") or "",
+                        "last_name": cust.get("LastName") or "",
+                        "phone": cust.get("PhoneNumber"),
+                        "email": cust.get("Email"),
+                        "birth_date": cust.get("BirthDate"),  # parsed once per customer on flush
+                        "address": cust.get("Address"),
+                        "city_raw": cust.get("City"),
+                        "zip": cust.get("Zip"),
+                    }
+                    books[unique_id] = {
+                        "title": title,
+                        "author_name": author_name,
+                        "description_html": lc.get("Description"),
+                        "publication_date": book_block.get("PublicationDate"),  # parsed once per book on flush
+                        "image_url": book_block.get("Image_url"),
+                        "total_borrowed": borrow_counts.get(unique_id, 0),  # count of BORROW events
+                    }
+                    copies[call_number] = unique_id
+
+                    # The event tuple itself is the uniqueness key - no hashing in the hot loop
+                    event_key = (event_type, action_dt, passport, call_number)
+                    if event_key in events:
+                        skipped_events += 1
+                        continue
+                    events[event_key] = None
+                    staged_events += 1
 
-                source_hash = sha256_hex(f"{event_type}|{action_dt}|{passport}|{call_number}")
+                    if len(events) >= BATCH_SIZE:
+                        created_events += self.write_chunk(customers, books, copies, events)
 
-                if dry_run:
-                    continue
+                if customers:
+                    created_events += self.write_chunk(customers, books, copies, events)
 
-                # DATABASE OPERATIONS
-                with transaction.atomic():
-                    # Create/update customer
-                    customer_obj, _ = Customer.objects.update_or_create(
-                        passport=passport,
-                        defaults={
-                            "first_name": cust.get("FirstName") or "",
-                            "last_name": cust.get("LastName") or "",
-                            "phone": cust.get("PhoneNumber"),
-                            "email": cust.get("Email"),
-                            "birth_date": safe_parse_datetime(cust.get("BirthDate")),
-                            "address": cust.get("Address"),
-                            "city_raw": cust.get("City"),
-                            "zip": cust.get("Zip"),
-                        },
-                    )
-
-                    # Create/update book with borrow count
-                    book_total_borrowed = borrow_counts.get(unique_id, 0)
-                    book_obj, _ = Book.objects.update_or_create(
-                        unique_id=unique_id,
-                        defaults={
-                            "title": title,
-                            "author_name": author_name,
-                            "description_html": lc.get("Description"),
-                            "publication_date": safe_parse_datetime(book_block.get("PublicationDate")),
-                            "image_url": book_block.get("Image_url"),
-                            "total_borrowed": book_total_borrowed,  # NEW FIELD - count of BORROW events
-                        },
-                    )
-
-                    # Create/update book copy with calculated availability
-                    copy_available = availability_states.get(call_number, True)
-                    copy_obj, _ = BookCopy.objects.update_or_create(
-                        call_number=call_number,
-                        defaults={
-                            "book": book_obj,
-                            "available": copy_available,  # NEW FIELD - calculated state
-                        },
-                    )
-
-                    # Create event
-                    event_obj, created = LibraryEvent.objects.get_or_create(
-                        source_hash=source_hash,
-                        defaults={
-                            "event_type": event_type,
-                            "action_dt": action_dt,
-                            "customer": customer_obj,
-                            "book_copy": copy_obj,
-                        },
-                    )
-
-                    if created:
-                        created_events += 1
-                    else:
-                        skipped_events += 1
+                # Duplicates across chunks or from earlier imports are dropped by the DB
+                skipped_events += staged_events - created_events
 
         except Exception as e:
             raise CommandError(str(e))
@@ -302,3 +364,11 @@ class Command(BaseCommand):
             f"skipped_events={skipped_events}, excluded_errors={excluded_errors}"
         ))
 
+        # Show final statistics
+        self.stdout.write("\nFinal database state:")
+        self.stdout.write(f"  Books: {Book.objects.count()}")
+        self.stdout.write(f"  Book Copies: {BookCopy.objects.count()}")
+        self.stdout.write(f"  Available Copies: {BookCopy.objects.filter(available=True).count()}")
+        self.stdout.write(f"  Borrowed Copies: {BookCopy.objects.filter(available=False).count()}")
+        self.stdout.write(f"  Customers: {Customer.objects.count()}")
+        self.stdout.write(f"  Events: {LibraryEvent.objects.count()}")
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-15 05:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crazyLibApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='libraryevent',
+            index=models.Index(fields=['customer', 'event_type', 'action_dt'], name='idx_ev_cust_type_dt'),
+        ),
+        migrations.AddIndex(
+            model_name='libraryevent',
+            index=models.Index(fields=['book_copy', 'event_type', 'action_dt'], name='idx_ev_copy_type_dt'),
+        ),
+        migrations.AddConstraint(
+            model_name='libraryevent',
+            constraint=models.UniqueConstraint(fields=('event_type', 'action_dt', 'customer', 'book_copy'), name='uniq_event_type_dt_cust_copy'),
+        ),
+    ]
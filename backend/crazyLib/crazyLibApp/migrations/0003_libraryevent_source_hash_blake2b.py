@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-15 05:10
+
+import hashlib
+from datetime import UTC
+
+from django.db import migrations, models
+
+
+def rehash_source_hash(apps, schema_editor):
+    """Replace 64-char SHA-256 values with the 32-char BLAKE2b hash used by import_logs"""
+    LibraryEvent = apps.get_model('crazyLibApp', 'LibraryEvent')
+    events = LibraryEvent.objects.exclude(source_hash=None).values_list(
+        'id', 'event_type', 'action_dt', 'customer__passport', 'book_copy__call_number'
+    )
+
+    batch = []
+    for event_id, event_type, action_dt, passport, call_number in events.iterator(chunk_size=10_000):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(b'|'.join(v.encode() for v in (event_type, action_dt.astimezone(UTC).isoformat(), passport, call_number)))
+        batch.append(LibraryEvent(id=event_id, source_hash=h.hexdigest()))
+        if len(batch) >= 10_000:
+            LibraryEvent.objects.bulk_update(batch, ['source_hash'])
+            batch = []
+    LibraryEvent.objects.bulk_update(batch, ['source_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crazyLibApp', '0002_libraryevent_unique_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(rehash_source_hash, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='libraryevent',
+            name='source_hash',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True),
+        ),
+    ]
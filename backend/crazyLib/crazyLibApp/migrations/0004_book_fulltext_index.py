@@ -0,0 +1,41 @@
+# Generated by Django 5.1.3 on 2026-10-15 05:20
+
+from django.db import migrations
+
+FULLTEXT_INDEX = 'book_search_ft'
+FULLTEXT_COLUMNS = ('title', 'author_name', 'unique_id')
+
+
+def add_fulltext_index(apps, schema_editor):
+    """FULLTEXT index for book autocomplete - MySQL only, other backends keep LIKE search"""
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    Book = apps.get_model('crazyLibApp', 'Book')
+    quote = schema_editor.quote_name
+    schema_editor.execute('ALTER TABLE %s ADD FULLTEXT INDEX %s (%s)' % (
+        quote(Book._meta.db_table),
+        quote(FULLTEXT_INDEX),
+        ', '.join(quote(column) for column in FULLTEXT_COLUMNS),
+    ))
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    Book = apps.get_model('crazyLibApp', 'Book')
+    quote = schema_editor.quote_name
+    schema_editor.execute('ALTER TABLE %s DROP INDEX %s' % (
+        quote(Book._meta.db_table),
+        quote(FULLTEXT_INDEX),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crazyLibApp', '0003_libraryevent_source_hash_blake2b'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
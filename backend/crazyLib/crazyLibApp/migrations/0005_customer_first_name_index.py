@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-15 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crazyLibApp', '0004_book_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['first_name'], name='crazyLibApp_first_n_0b5320_idx'),
+        ),
+    ]
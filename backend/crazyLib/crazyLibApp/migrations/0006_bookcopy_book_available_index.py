@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-15 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crazyLibApp', '0005_customer_first_name_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookcopy',
+            index=models.Index(fields=['book', 'available'], name='crazyLibApp_book_id_0f7890_idx'),
+        ),
+        # (book, available) serves every book-only lookup; dropped after the
+        # new index exists so InnoDB always has one for the book FK
+        migrations.RemoveIndex(
+            model_name='bookcopy',
+            name='crazyLibApp_book_id_510588_idx',
+        ),
+    ]
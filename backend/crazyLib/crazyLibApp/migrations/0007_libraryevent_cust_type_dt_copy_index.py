@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-15 05:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crazyLibApp', '0006_bookcopy_book_available_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='libraryevent',
+            index=models.Index(fields=['customer', 'event_type', '-action_dt', 'book_copy'], name='libev_cust_type_dt_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='libraryevent',
+            name='idx_ev_cust_type_dt',
+        ),
+    ]
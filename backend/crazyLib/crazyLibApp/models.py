@@ -17,6 +17,8 @@ class Customer(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["last_name", "first_name"]),
+            # Autocomplete matches first_name on its own (istartswith -> LIKE 'x%')
+            models.Index(fields=["first_name"]),
             models.Index(fields=["phone"]),
         ]
 
@@ -60,8 +62,9 @@ class BookCopy(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["book"]),
             models.Index(fields=["available"]),
+            # "Any copy of this book available?" probe; also covers lookups by book alone
+            models.Index(fields=["book", "available"]),
         ]
 
     def __str__(self):
@@ -77,7 +80,7 @@ class LibraryEvent(models.Model):
     action_dt = models.DateTimeField()
     customer = models.ForeignKey(Customer, on_delete=models.PROTECT, related_name="events")
     book_copy = models.ForeignKey(BookCopy, on_delete=models.PROTECT, related_name="events")
-    source_hash = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    source_hash = models.CharField(max_length=32, unique=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -86,9 +89,18 @@ class LibraryEvent(models.Model):
             models.Index(fields=["book_copy", "action_dt"]),
             models.Index(fields=["event_type", "action_dt"]),
 
-            models.Index(fields=["customer", "event_type", "action_dt"], name="idx_ev_cust_type_dt"),
+            # Customer borrowed/history pages: seek on (customer, type), newest first;
+            # book_copy is a trailing key column since MySQL has no INCLUDE
+            models.Index(fields=["customer", "event_type", "-action_dt", "book_copy"], name="libev_cust_type_dt_idx"),
             models.Index(fields=["book_copy", "event_type", "action_dt"], name="idx_ev_copy_type_dt"),
         ]
+        constraints = [
+            # Natural key of an event - lets bulk imports skip duplicates on the DB side
+            models.UniqueConstraint(
+                fields=["event_type", "action_dt", "customer", "book_copy"],
+                name="uniq_event_type_dt_cust_copy",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.event_type} {self.action_dt} {self.customer_id} {self.book_copy_id}"
\ No newline at end of file
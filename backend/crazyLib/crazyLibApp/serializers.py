@@ -15,47 +15,45 @@ class CustomerSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class CustomerSearchSerializer(serializers.ModelSerializer):
+class CustomerListSerializer(CustomerSerializer):
+    """CustomerSerializer with the number of books currently borrowed"""
 
-    text = serializers.SerializerMethodField()
+    # Prefetched by CustomerViewSet.get_queryset
+    active_borrows_count = serializers.SerializerMethodField()
 
-    class Meta:
-        model = Customer
-        fields = ['id', 'text', 'phone', 'passport']
+    class Meta(CustomerSerializer.Meta):
+        fields = CustomerSerializer.Meta.fields + ['active_borrows_count']
 
-    def get_text(self, obj):
-        return f"{obj.last_name} {obj.first_name}"
+    def get_active_borrows_count(self, obj):
+        return len(obj.active_borrows)
 
 
 class BookSerializer(serializers.ModelSerializer):
 
-    copies_count = serializers.SerializerMethodField()
-    available_copies = serializers.SerializerMethodField()
+    # Annotated by BookViewSet.get_queryset
+    copies_count = serializers.IntegerField(read_only=True)
+    available_copies = serializers.IntegerField(read_only=True)
+    has_available = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Book
         fields = [
             'id', 'unique_id', 'title', 'author_name',
             'description_html', 'publication_date', 'image_url',
-            'copies_count', 'available_copies', 'total_borrowed',
-            'created_at', 'updated_at'
+            'copies_count', 'available_copies', 'has_available',
+            'total_borrowed', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
 
-    def get_copies_count(self, obj):
-        return obj.copies.count()
-
-    def get_available_copies(self, obj):
-        return obj.copies.filter(available=True).count()
-
-
-class BookSearchSerializer(serializers.ModelSerializer):
 
-    text = serializers.CharField(source='title')
+class BookListSerializer(BookSerializer):
+    """BookSerializer without description_html and exact available count for list responses"""
 
-    class Meta:
-        model = Book
-        fields = ['id', 'text', 'author_name', 'unique_id']
+    class Meta(BookSerializer.Meta):
+        fields = [
+            f for f in BookSerializer.Meta.fields
+            if f not in ('description_html', 'available_copies')
+        ]
 
 
 class BookCopySerializer(serializers.ModelSerializer):
@@ -72,23 +70,11 @@ class BookCopySerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
-class BookCopySearchSerializer(serializers.ModelSerializer):
-
-    text = serializers.SerializerMethodField()
-    book_title = serializers.CharField(source='book.title', read_only=True)
-
-    class Meta:
-        model = BookCopy
-        fields = ['id', 'text', 'call_number', 'book_title']
-
-    def get_text(self, obj):
-        return f"{obj.call_number} - {obj.book.title}"
-
-
 class LibraryEventSerializer(serializers.ModelSerializer):
 
-    customer_name = serializers.SerializerMethodField()
-    book_title = serializers.CharField(source='book_copy.book.title', read_only=True)
+    # Annotated by LibraryEventViewSet.get_queryset
+    customer_name = serializers.CharField(source='customer_name_anno', read_only=True)
+    book_title = serializers.CharField(source='book_title_anno', read_only=True)
 
     class Meta:
         model = LibraryEvent
@@ -97,7 +83,4 @@ class LibraryEventSerializer(serializers.ModelSerializer):
             'customer_name', 'book_copy', 'book_title',
             'source_hash', 'created_at'
         ]
-        read_only_fields = ['created_at']
-
-    def get_customer_name(self, obj):
-        return f"{obj.customer.last_name} {obj.customer.first_name}"
\ No newline at end of file
+        read_only_fields = ['created_at']
\ No newline at end of file
@@ -1,3 +1,134 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, UTC
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from .management.commands.import_logs import insert_events, natural_key_ids
+from .models import Customer, Book, BookCopy, LibraryEvent
+
+
+def log_record(passport, unique_id, call_number, event_type, action_dt):
+    return {
+        "Book": {
+            "LiteraryCreation": {
+                "Author": {"Name": "Author"},
+                "Title": f"Title {unique_id}",
+                "Description": None,
+                "UniqueID": unique_id,
+            },
+            "PublicationDate": "2013-10-29T00:00:00",
+            "Image_url": None,
+            "LibraryCallNumber": call_number,
+        },
+        "Customer": {
+            "FirstName": "First",
+            "LastName": "Last",
+            "Passport": passport,
+            "BirthDate": "1990-01-01T00:00:00+03:00",
+        },
+        "Type": event_type,
+        "ActionDateTime": action_dt,
+    }
+
+
+class NaturalKeyLookupTests(TestCase):
+    """Natural keys whose spelling differs from the stored row only by case"""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(first_name="A", last_name="B", passport="AB1")
+        book = Book.objects.create(unique_id="BOOK-1", title="Book")
+        self.copy = BookCopy.objects.create(book=book, call_number="CN-1")
+
+    def test_natural_key_ids_falls_back_to_case_insensitive_match(self):
+        ids = natural_key_ids(Customer, "passport", ["ab1", "AB1"])
+        self.assertEqual(ids["ab1"], self.customer.id)
+        self.assertEqual(ids["AB1"], self.customer.id)
+
+    def test_insert_events_with_mixed_case_keys(self):
+        action_dt = datetime(2022, 8, 30, 5, 48, tzinfo=UTC)
+        created = insert_events({(LibraryEvent.EventType.BORROW, action_dt, "ab1", "cn-1"): None})
+
+        self.assertEqual(created, 1)
+        event = LibraryEvent.objects.get()
+        self.assertEqual(event.customer_id, self.customer.id)
+        self.assertEqual(event.book_copy_id, self.copy.id)
+
+
+class ImportLogsTests(TestCase):
+
+    def import_records(self, records):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            json.dump(records, f)
+        call_command("import_logs", path, stdout=open(os.devnull, "w"))
+
+    def test_import_with_mixed_case_natural_keys(self):
+        self.import_records([
+            log_record("ab1", "book-1", "cn-1", "Borrow", "2022-08-30T08:00:00+03:00"),
+            log_record("AB1", "BOOK-1", "CN-1", "Release", "2022-08-31T08:00:00+03:00"),
+            log_record("Ab1", "Book-1", "Cn-1", "Borrow", "2022-09-01T08:00:00+03:00"),
+        ])
+
+        self.assertEqual(LibraryEvent.objects.count(), 3)
+        for event in LibraryEvent.objects.select_related("customer", "book_copy"):
+            self.assertEqual(event.customer.passport.lower(), "ab1")
+            self.assertEqual(event.book_copy.call_number.lower(), "cn-1")
+
+
+class CustomerEventPagesTests(TestCase):
+    """borrowed/history pages seek on LibraryEvent columns whatever ?ordering= says"""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(first_name="A", last_name="B", passport="AB1")
+        book = Book.objects.create(unique_id="BOOK-1", title="Book")
+        copy = BookCopy.objects.create(book=book, call_number="CN-1")
+        LibraryEvent.objects.create(
+            event_type=LibraryEvent.EventType.BORROW,
+            action_dt=datetime(2022, 8, 30, 5, 48, tzinfo=UTC),
+            customer=self.customer,
+            book_copy=copy,
+        )
+
+    def test_customer_ordering_parameter_is_ignored(self):
+        for page in ("borrowed", "history"):
+            with self.subTest(page=page):
+                response = self.client.get(
+                    f"/api/customers/{self.customer.id}/{page}/", {"ordering": "first_name"}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["count"], 1)
+
+
+class EventExportTests(TestCase):
+    """Keyset chunks of the export cover every event once, in the requested order"""
+
+    def setUp(self):
+        customer = Customer.objects.create(first_name="A", last_name="B", passport="AB1")
+        book = Book.objects.create(unique_id="BOOK-1", title="Book")
+        copy = BookCopy.objects.create(book=book, call_number="CN-1")
+        start = datetime(2022, 8, 30, 5, 48, tzinfo=UTC)
+        # Pairs of events share action_dt, so chunks end in the middle of ties
+        for i in range(7):
+            LibraryEvent.objects.create(
+                event_type=LibraryEvent.EventType.BORROW if i % 2 else LibraryEvent.EventType.RELEASE,
+                action_dt=start + timedelta(days=i // 2),
+                customer=customer,
+                book_copy=copy,
+            )
+
+    @mock.patch("crazyLibApp.views.EXPORT_CHUNK_SIZE", 2)
+    def test_export_chunks_follow_ordering(self):
+        for ordering in ("action_dt", "-action_dt", "created_at"):
+            with self.subTest(ordering=ordering):
+                response = self.client.get("/api/events/export/", {"ordering": ordering})
+                exported = [row["id"] for row in json.loads(b"".join(response.streaming_content))]
+                expected = list(
+                    LibraryEvent.objects.order_by(ordering, "-id" if ordering.startswith("-") else "id")
+                    .values_list("id", flat=True)
+                )
+                self.assertEqual(exported, expected)
@@ -1,28 +1,127 @@
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-from django.db.models import Q, Exists, OuterRef
+import hashlib
+import operator
+import re
+from functools import reduce
+
+import orjson
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.db.models import F, Q, Count, Exists, OuterRef, Prefetch, Subquery, Value, CharField, FloatField
+from django.db.models.functions import Concat
+from django.db.models.expressions import RawSQL
 from .models import Customer, Book, BookCopy, LibraryEvent
 from django.utils import timezone
 from rest_framework import status
 from .serializers import (
-    CustomerSerializer, CustomerSearchSerializer,
-    BookSerializer, BookSearchSerializer,
-    BookCopySerializer, BookCopySearchSerializer,
+    CustomerSerializer, CustomerListSerializer,
+    BookSerializer, BookListSerializer,
+    BookCopySerializer,
     LibraryEventSerializer
 )
-from django.db import transaction
+from django.db import connection, transaction
 
 # Search configuration
 SEARCH_MAX_RESULTS = 10
 
+# Autocomplete results are cached briefly - popular prefixes repeat on every keystroke
+SEARCH_CACHE_TIMEOUT = 30
+
+# Rows fetched per database round-trip by the streamed event export
+EXPORT_CHUNK_SIZE = 500
+
+# InnoDB ignores shorter words in FULLTEXT indexes (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN = 3
+# InnoDB default stopword list - these words are not indexed either
+FULLTEXT_STOPWORDS = frozenset({
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for",
+    "from", "how", "i", "in", "is", "it", "la", "of", "on", "or", "that", "the",
+    "this", "to", "was", "what", "when", "where", "who", "will", "with", "und", "www",
+})
+# Columns of the book_search_ft index, see migration 0004
+BOOK_FULLTEXT_MATCH = "MATCH (title, author_name, unique_id) AGAINST (%s IN BOOLEAN MODE)"
+
+
+class EventCursorPagination(CursorPagination):
+    """
+    Keyset pagination for per-customer event lists, newest first
+    Pages seek on action_dt instead of sorting the whole filtered set
+    """
+    ordering = ('-action_dt', '-id')
+    page_size = SEARCH_MAX_RESULTS
+
+    def get_ordering(self, request, queryset, view):
+        # The view's OrderingFilter validates ?ordering= against its own model,
+        # not LibraryEvent - event pages keep the fixed seek order
+        return self.ordering
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+            'count': len(data)
+        })
+
+
+class HistoryCursorPagination(EventCursorPagination):
+    page_size = 50
+
+
+def currently_borrowed(events):
+    """BORROW events from the queryset without a later RELEASE of the same copy"""
+    later_release = LibraryEvent.objects.filter(
+        book_copy=OuterRef('book_copy'),
+        event_type=LibraryEvent.EventType.RELEASE,
+        action_dt__gt=OuterRef('action_dt')
+    )
+    return events.filter(event_type=LibraryEvent.EventType.BORROW).filter(~Exists(later_release))
+
+
+def rows_after(ordering, row):
+    """
+    Q for the rows that come after `row` in `ordering` (keyset seek)
+    The last ordering key must be unique, e.g. id
+    """
+    after = Q()
+    equal = Q()
+    for key in ordering:
+        field = key.lstrip('-')
+        lookup = 'lt' if key.startswith('-') else 'gt'
+        after |= equal & Q(**{f'{field}__{lookup}': row[field]})
+        equal &= Q(**{field: row[field]})
+    return after
+
+
+def cached_suggestions(basename, query, build):
+    """
+    Return serialized autocomplete results for (basename, query) from cache,
+    calling build() only on a miss
+    """
+    digest = hashlib.blake2b(query.lower().encode(), digest_size=16).hexdigest()
+    return cache.get_or_set(f"ac:{basename}:{digest}", build, timeout=SEARCH_CACHE_TIMEOUT)
+
 
 class FirstLetterSearchMixin:
     """
     Mixin for searching by first letters of each word with OR logic
+
+    All conditions are composed into one Q and applied with a single
+    .filter() call. Chaining .filter() per word would join multi-valued
+    relations once per call and blow up the query plan. The default
+    SearchFilter (?search=) needs no patch for this: since DRF 3.15 it
+    also folds its terms into one filter(reduce(and_, ...)).
     """
     search_fields = []  # Override in each ViewSet
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Lookup names are fixed per class - build them once, not on every keystroke
+        cls._lookup_fields = tuple(f"{field}__istartswith" for field in cls.search_fields)
+
     def get_search_queryset(self, queryset, query):
         """
         Search by first letters of each word
@@ -33,15 +132,37 @@ class FirstLetterSearchMixin:
         # Split query into words
         words = query.strip().split()
 
-        # Create Q objects for each word and each field
-        q_objects = Q()
-        for word in words:
-            for field in self.search_fields:
-                q_objects |= Q(**{f"{field}__istartswith": word})
+        # One Q object for each word and each field, OR-ed together
+        q_objects = reduce(
+            operator.or_,
+            (Q(**{lookup: word}) for word in words for lookup in self._lookup_fields),
+            Q()
+        )
 
         return queryset.filter(q_objects)
 
 
+class ReloadAnnotatedMixin:
+    """
+    Mixin for viewsets whose get_queryset() adds annotations
+
+    The instance saved by the serializer has none of them, so after
+    create/update it is fetched again through get_queryset() and the
+    response carries the same fields as a GET.
+    """
+
+    def reload_instance(self, serializer):
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.reload_instance(serializer)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.reload_instance(serializer)
+
+
 class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
     """
     ViewSet for working with customers
@@ -61,6 +182,25 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
     search_fields = ['first_name', 'last_name', 'phone', 'passport']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'search':
+            # Only the columns autocomplete returns
+            return queryset.only('id', 'last_name', 'first_name', 'phone', 'passport')
+        if self.action == 'list':
+            # Open borrows of the whole page in one extra IN query
+            queryset = queryset.prefetch_related(Prefetch(
+                'events',
+                queryset=currently_borrowed(LibraryEvent.objects.all()).only('id', 'customer_id'),
+                to_attr='active_borrows'
+            ))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CustomerListSerializer
+        return CustomerSerializer
+
     def get_search_queryset(self, queryset, query):
         if not query:
             return queryset.none()
@@ -110,18 +250,25 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
                 'count': 0
             })
 
-        # Get search results
-        results = self.get_search_queryset(self.queryset, query)
+        def build():
+            # Get search results
+            results = self.get_search_queryset(self.get_queryset(), query)
+
+            # Limit number of results, plain dicts - no model instances for autocomplete
+            rows = results.values('id', 'last_name', 'first_name', 'phone', 'passport')[:SEARCH_MAX_RESULTS]
 
-        # Limit number of results
-        results = results[:SEARCH_MAX_RESULTS]
+            return [{
+                'id': r['id'],
+                'text': f"{r['last_name']} {r['first_name']}",
+                'phone': r['phone'],
+                'passport': r['passport'],
+            } for r in rows]
 
-        # Use simplified serializer for autocomplete
-        serializer = CustomerSearchSerializer(results, many=True)
+        suggestions = cached_suggestions(self.basename, query, build)
 
         return Response({
-            'suggestions': serializer.data,
-            'count': len(serializer.data)
+            'suggestions': suggestions,
+            'count': len(suggestions)
         })
 
     @action(detail=True, methods=['get'])
@@ -132,21 +279,13 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
         """
         customer = self.get_object()
 
-        borrows = LibraryEvent.objects.filter(
-            customer=customer,
-            event_type=LibraryEvent.EventType.BORROW
-        )
-
-        later_release = LibraryEvent.objects.filter(
-            book_copy=OuterRef('book_copy'),
-            event_type=LibraryEvent.EventType.RELEASE,
-            action_dt__gt=OuterRef('action_dt')
-        )
-
-        borrows = borrows.annotate(has_later_release=Exists(later_release)).filter(has_later_release=False)
+        borrows = currently_borrowed(LibraryEvent.objects.filter(customer=customer))
 
         # select_related to avoid N+1
-        borrows = borrows.select_related('book_copy', 'book_copy__book').order_by('-action_dt')[:SEARCH_MAX_RESULTS]
+        borrows = borrows.select_related('book_copy', 'book_copy__book')
+
+        paginator = EventCursorPagination()
+        page = paginator.paginate_queryset(borrows, request, view=self)
 
         data = [{
             "event_id": e.id,
@@ -155,12 +294,9 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
             "title": e.book_copy.book.title,
             "author": e.book_copy.book.author_name,
             "book_copy_id": e.book_copy.id,
-        } for e in borrows]
+        } for e in page]
 
-        return Response({
-            "results": data,
-            "count": len(data)
-        })
+        return paginator.get_paginated_response(data)
 
     @action(detail=True, methods=['post'], url_path='return')
     def return_book(self, request, pk=None):
@@ -172,7 +308,7 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            borrow_event = LibraryEvent.objects.select_related("book_copy", "book_copy__book").get(
+            borrow_event = LibraryEvent.objects.only("book_copy_id", "action_dt").get(
                 id=borrow_event_id,
                 customer=customer,
                 event_type=LibraryEvent.EventType.BORROW
@@ -181,29 +317,34 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
             return Response({"detail": "Borrow event not found for this customer"},
                             status=status.HTTP_404_NOT_FOUND)
 
-        already_returned = LibraryEvent.objects.filter(
-            book_copy=borrow_event.book_copy,
+        later_release = LibraryEvent.objects.filter(
+            book_copy=OuterRef('pk'),
             event_type=LibraryEvent.EventType.RELEASE,
             action_dt__gt=borrow_event.action_dt
-        ).exists()
-        if already_returned:
-            return Response({"detail": "This book is already returned"},
-                            status=status.HTTP_400_BAD_REQUEST)
+        )
 
-        with transaction.atomic():
+        # Build the event before the transaction, it only holds the UPDATE and the INSERT
+        release_event = LibraryEvent(
+            event_type=LibraryEvent.EventType.RELEASE,
+            action_dt=timezone.now(),
+            customer=customer,
+            book_copy_id=borrow_event.book_copy_id
+        )
 
-            copy = BookCopy.objects.select_for_update().get(id=borrow_event.book_copy_id)
+        with transaction.atomic():
+            # Release the copy only if it is still out and this borrow was not returned yet -
+            # the check and the write are one UPDATE, no row lock is held from Python
+            returned = BookCopy.objects.filter(
+                ~Exists(later_release),
+                id=borrow_event.book_copy_id,
+                available=False
+            ).update(available=True)
 
+            if not returned:
+                return Response({"detail": "This book is already returned"},
+                                status=status.HTTP_400_BAD_REQUEST)
 
-            copy.available = True
-            copy.save(update_fields=["available"])
-
-            release_event = LibraryEvent.objects.create(
-                event_type=LibraryEvent.EventType.RELEASE,
-                action_dt=timezone.now(),
-                customer=customer,
-                book_copy=copy
-            )
+            release_event.save(force_insert=True)
 
         return Response({"status": "ok", "release_event_id": release_event.id},
                         status=status.HTTP_201_CREATED)
@@ -226,38 +367,39 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
 
         try:
             # Check if book exists
-            book = Book.objects.get(id=book_id)
+            book = Book.objects.only('id', 'title').get(id=book_id)
         except Book.DoesNotExist:
             return Response({"detail": "Book not found"},
                             status=status.HTTP_404_NOT_FOUND)
 
-        # Find available copy
-        available_copy = BookCopy.objects.filter(
-            book_id=book_id,
-            available=True
-        ).first()
-
-        if not available_copy:
-            return Response({"detail": f"No available copies of '{book.title}'"},
-                            status=status.HTTP_400_BAD_REQUEST)
+        # Build the event before the transaction, only the copy is filled in under the lock
+        borrow_event = LibraryEvent(
+            event_type=LibraryEvent.EventType.BORROW,
+            action_dt=timezone.now(),
+            customer=customer
+        )
 
-        # Create borrow event and update counters
+        # Claim a copy and create borrow event in one short transaction
         with transaction.atomic():
+            # Lock one available copy, copies locked by concurrent borrows are skipped
+            copy_id = BookCopy.objects.select_for_update(skip_locked=True).filter(
+                book_id=book.id,
+                available=True
+            ).values_list('id', flat=True).first()
+
+            if copy_id is None:
+                return Response({"detail": f"No available copies of '{book.title}'"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
             # Mark copy as unavailable
-            available_copy.available = False
-            available_copy.save(update_fields=["available"])
+            BookCopy.objects.filter(id=copy_id).update(available=False)
 
-            # Increment book borrow counter
-            book.total_borrowed += 1
-            book.save(update_fields=["total_borrowed"])
+            # Increment book borrow counter in SQL - no lost updates
+            Book.objects.filter(id=book.id).update(total_borrowed=F('total_borrowed') + 1)
 
             # Create borrow event
-            borrow_event = LibraryEvent.objects.create(
-                event_type=LibraryEvent.EventType.BORROW,
-                action_dt=timezone.now(),
-                customer=customer,
-                book_copy=available_copy
-            )
+            borrow_event.book_copy_id = copy_id
+            borrow_event.save(force_insert=True)
 
         return Response({
             "status": "ok",
@@ -275,40 +417,40 @@ class CustomerViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
         """
         customer = self.get_object()
 
-        # Get all BORROW events for this customer
+        # First RELEASE of the same copy after the borrow (idx_ev_copy_type_dt)
+        release_dt = LibraryEvent.objects.filter(
+            book_copy=OuterRef('book_copy'),
+            event_type=LibraryEvent.EventType.RELEASE,
+            action_dt__gt=OuterRef('action_dt')
+        ).order_by('action_dt').values('action_dt')[:1]
+
+        # Get all BORROW events for this customer with their return date
         borrows = LibraryEvent.objects.filter(
             customer=customer,
             event_type=LibraryEvent.EventType.BORROW
-        ).select_related('book_copy', 'book_copy__book').order_by('-action_dt')[:50]
-
-        data = []
-        for borrow in borrows:
-            # Find corresponding RELEASE event
-            release = LibraryEvent.objects.filter(
-                book_copy=borrow.book_copy,
-                event_type=LibraryEvent.EventType.RELEASE,
-                action_dt__gt=borrow.action_dt
-            ).first()
-
-            data.append({
-                "borrow_event_id": borrow.id,
-                "borrowed_on": borrow.action_dt,
-                "returned_on": release.action_dt if release else None,
-                "book_id": borrow.book_copy.book.id,
-                "title": borrow.book_copy.book.title,
-                "author": borrow.book_copy.book.author_name,
-                "book_copy_id": borrow.book_copy.id,
-                "status": "returned" if release else "currently borrowed"
-            })
+        ).annotate(
+            returned_on=Subquery(release_dt)
+        ).select_related('book_copy', 'book_copy__book')
 
-        return Response({
-            "results": data,
-            "count": len(data)
-        })
+        paginator = HistoryCursorPagination()
+        page = paginator.paginate_queryset(borrows, request, view=self)
+
+        data = [{
+            "borrow_event_id": borrow.id,
+            "borrowed_on": borrow.action_dt,
+            "returned_on": borrow.returned_on,
+            "book_id": borrow.book_copy.book.id,
+            "title": borrow.book_copy.book.title,
+            "author": borrow.book_copy.book.author_name,
+            "book_copy_id": borrow.book_copy.id,
+            "status": "currently borrowed" if borrow.returned_on is None else "returned"
+        } for borrow in page]
+
+        return paginator.get_paginated_response(data)
 
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ReloadAnnotatedMixin, viewsets.ModelViewSet):
     """
     ViewSet for working with books
 
@@ -316,11 +458,42 @@ class BookViewSet(viewsets.ModelViewSet):
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    ordering = ['id']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'search':
+            # Autocomplete needs no copy counters
+            return queryset.only('id', 'title', 'author_name', 'unique_id')
+
+        # Copy counters for BookSerializer in the same query as the books
+        queryset = queryset.annotate(
+            copies_count=Count('copies'),
+            has_available=Exists(BookCopy.objects.filter(book=OuterRef('pk'), available=True)),
+        )
+
+        if self.action == 'list':
+            # description_html can be large, the list serializer does not return it;
+            # the list only says whether a copy is free - EXISTS stops at the first one
+            return queryset.defer('description_html')
+
+        return queryset.annotate(
+            available_copies=Count('copies', filter=Q(copies__available=True)),
+        )
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return BookListSerializer
+        return BookSerializer
 
     def get_book_search_queryset(self, queryset, query):
         """
-        Search books by substring in title, author, or UID
-        More strict than FirstLetterSearchMixin - requires full substring match
+        Search books by word prefixes in title, author, or UID
+        On MySQL this is one FULLTEXT index probe ranked by relevance: every
+        word must prefix some word of the book (order and adjacency are not
+        checked, so "potter harry" matches too). Words InnoDB does not index
+        (too short or stopwords) are left out of the match; if nothing is
+        left, or on other databases, it falls back to substring search
         """
         if not query:
             return queryset.none()
@@ -329,6 +502,16 @@ class BookViewSet(viewsets.ModelViewSet):
         if not query:
             return queryset.none()
 
+        # Boolean mode operators are dropped, every word becomes a required prefix term
+        words = [
+            w for w in re.findall(r"\w+", query)
+            if len(w) >= FULLTEXT_MIN_TOKEN and w.lower() not in FULLTEXT_STOPWORDS
+        ]
+        if connection.vendor == 'mysql' and words:
+            terms = " ".join(f"+{w}*" for w in words)
+            relevance = RawSQL(BOOK_FULLTEXT_MATCH, (terms,), output_field=FloatField())
+            return queryset.annotate(relevance=relevance).filter(relevance__gt=0).order_by('-relevance')
+
         # Use icontains for substring search (not istartswith by words)
         q_objects = (
                 Q(title__icontains=query) |
@@ -352,15 +535,23 @@ class BookViewSet(viewsets.ModelViewSet):
                 'count': 0
             })
 
-        # Use the new search method
-        results = self.get_book_search_queryset(self.queryset, query)
-        results = results[:SEARCH_MAX_RESULTS]
+        def build():
+            # Use the new search method
+            results = self.get_book_search_queryset(self.get_queryset(), query)
+            rows = results.values('id', 'title', 'author_name', 'unique_id')[:SEARCH_MAX_RESULTS]
+
+            return [{
+                'id': r['id'],
+                'text': r['title'],
+                'author_name': r['author_name'],
+                'unique_id': r['unique_id'],
+            } for r in rows]
 
-        serializer = BookSearchSerializer(results, many=True)
+        suggestions = cached_suggestions(self.basename, query, build)
 
         return Response({
-            'suggestions': serializer.data,
-            'count': len(serializer.data)
+            'suggestions': suggestions,
+            'count': len(suggestions)
         })
 
 
@@ -388,29 +579,94 @@ class BookCopyViewSet(FirstLetterSearchMixin, viewsets.ModelViewSet):
                 'count': 0
             })
 
-        results = self.get_search_queryset(self.queryset, query)
-        results = results[:SEARCH_MAX_RESULTS]
+        def build():
+            results = self.get_search_queryset(self.get_queryset(), query)
+            rows = results.values('id', 'call_number', 'book__title')[:SEARCH_MAX_RESULTS]
 
-        serializer = BookCopySearchSerializer(results, many=True)
+            return [{
+                'id': r['id'],
+                'text': f"{r['call_number']} - {r['book__title']}",
+                'call_number': r['call_number'],
+                'book_title': r['book__title'],
+            } for r in rows]
+
+        suggestions = cached_suggestions(self.basename, query, build)
 
         return Response({
-            'suggestions': serializer.data,
-            'count': len(serializer.data)
+            'suggestions': suggestions,
+            'count': len(suggestions)
         })
 
 
-class LibraryEventViewSet(viewsets.ModelViewSet):
+class LibraryEventViewSet(ReloadAnnotatedMixin, viewsets.ModelViewSet):
     """
     ViewSet for working with library events (borrow/return)
 
     CRUD operations for events
     """
-    queryset = LibraryEvent.objects.select_related(
-        'customer', 'book_copy', 'book_copy__book'
-    ).all()
+    queryset = LibraryEvent.objects.all()
     serializer_class = LibraryEventSerializer
 
     # Can add filtering by event type, date, customer, etc.
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['action_dt', 'created_at']
-    ordering = ['-action_dt']
\ No newline at end of file
+    ordering = ['-action_dt']
+
+    def get_queryset(self):
+        # Display names for LibraryEventSerializer are built by the database
+        return super().get_queryset().annotate(
+            customer_name_anno=Concat(
+                'customer__last_name', Value(' '), 'customer__first_name',
+                output_field=CharField()
+            ),
+            book_title_anno=F('book_copy__book__title'),
+        )
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        All events as one streamed JSON array, same fields as the list endpoint
+        Rows are fetched EXPORT_CHUNK_SIZE at a time by keyset (?ordering= then id)
+        and written as they arrive, so memory does not grow with the table
+        GET /api/events/export/?ordering=action_dt
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = list(filters.OrderingFilter().get_ordering(request, queryset, self))
+        # id breaks ties so every row has a unique position to seek from
+        ordering.append('-id' if ordering and ordering[-1].startswith('-') else 'id')
+
+        rows = queryset.order_by(*ordering).values(
+            'id', 'event_type', 'action_dt', 'customer_id', 'customer_name_anno',
+            'book_copy_id', 'book_title_anno', 'source_hash', 'created_at'
+        )
+
+        # Datetimes are formatted by the serializer fields to match the list output
+        fields = self.get_serializer().fields
+        action_dt_field = fields['action_dt']
+        created_at_field = fields['created_at']
+
+        def stream():
+            separator = b'['
+            page = rows
+            while True:
+                # One bounded query per chunk - mysqlclient buffers whole result sets
+                chunk = list(page[:EXPORT_CHUNK_SIZE])
+                for row in chunk:
+                    yield separator + orjson.dumps({
+                        'id': row['id'],
+                        'event_type': row['event_type'],
+                        'action_dt': action_dt_field.to_representation(row['action_dt']),
+                        'customer': row['customer_id'],
+                        'customer_name': row['customer_name_anno'],
+                        'book_copy': row['book_copy_id'],
+                        'book_title': row['book_title_anno'],
+                        'source_hash': row['source_hash'],
+                        'created_at': created_at_field.to_representation(row['created_at']),
+                    })
+                    separator = b','
+                if len(chunk) < EXPORT_CHUNK_SIZE:
+                    break
+                page = rows.filter(rows_after(ordering, chunk[-1]))
+            yield b'[]' if separator == b'[' else b']'
+
+        return StreamingHttpResponse(stream(), content_type='application/json')
\ No newline at end of file